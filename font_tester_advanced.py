@@ -1,13 +1,13 @@
 import sys
 import random
 from collections import Counter
+from functools import lru_cache
 from PyQt5.QtWidgets import (
     QApplication,
     QMainWindow,
     QVBoxLayout,
     QHBoxLayout,
     QLabel,
-    QTextEdit,
     QPushButton,
     QProgressBar,
     QInputDialog,
@@ -17,40 +17,78 @@ from PyQt5.QtWidgets import (
     QFormLayout,
     QDialog,
     QDialogButtonBox,
+    QShortcut,
+    QScrollArea,
 )
-from PyQt5.QtGui import QFontDatabase, QFont, QIntValidator
-from PyQt5.QtCore import Qt, QEvent
+from PyQt5.QtGui import QFontDatabase, QFont, QIntValidator, QKeySequence
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
+
+
+# Sample text shown in both preview panels
+_SAMPLE_HTML = """
+<h1>Heading: The quick brown fox jumps over the lazy dog</h1>
+<p><b>Bold:</b> <b>This is bold text</b></p>
+<p><i>Italic:</i> <i>This is italicized text</i></p>
+<p><b><i>Bold & Italic:</i></b> <b><i>This is bold and italicized text</i></b></p>
+<ul>
+    <li>First bullet point</li>
+    <li>Second bullet point</li>
+</ul>
+<blockquote>A font comparison tool for better typography.</blockquote>
+"""
 
 
 def filter_english_fonts(fonts):
     """Filter the font list to include only English-compatible fonts."""
-    return [f for f in fonts if not f.startswith("@") and all(ord(c) < 128 for c in f)]
+    return [f for f in fonts if not f.startswith("@") and f.isascii()]
 
 
 def filter_fonts_by_string(fonts, filter_string):
     """Filter the font list to include only fonts whose names contain the given string (case-insensitive)."""
     filter_string = filter_string.lower()
-    return [f for f in fonts if filter_string in f.lower()]
+    lower = str.lower
+    return [f for f in fonts if filter_string in lower(f)]
+
+
+@lru_cache(maxsize=1)
+def _scaled_point_size():
+    """Return the UI label point size scaled to the primary screen's DPI (default DPI is 96)."""
+    return int(10 + QApplication.primaryScreen().logicalDotsPerInch() // 96)
+
+
+@lru_cache(maxsize=1)
+def _font_families():
+    """Return the installed font families, enumerating the system font database only once."""
+    return QFontDatabase().families()
+
+
+class FontLoaderThread(QThread):
+    """Background thread that enumerates the English-compatible system fonts."""
+    families_ready = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fonts = []
+
+    def run(self):
+        self.fonts = filter_english_fonts(_font_families())
+        self.families_ready.emit(self.fonts)
 
 
 class FontSelectionDialog(QDialog):
     """Custom dialog to accept font filter and number of fonts."""
-    def __init__(self, total_fonts, parent=None):
+    def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Font Tester Options")
 
         self.filter_text = QLineEdit(self)
         self.font_count = QLineEdit(self)
-        self.font_count.setValidator(QIntValidator(2, total_fonts))  # Only accept valid integer values
-
-        # Get screen DPI to scale the fonts based on the screen size
-        screen = QApplication.primaryScreen()
-        dpi = screen.logicalDotsPerInch()
+        self.font_count_validator = QIntValidator(2, 2**31 - 1, self)  # Only accept valid integer values
+        self.font_count.setValidator(self.font_count_validator)
 
         # Set the font size to scale with DPI for labels
         font = QFont()
-        scaled_font_size = int(10 + dpi // 96)  # Scale font size based on DPI (default DPI is 96)
-        font.setPointSize(scaled_font_size)
+        font.setPointSize(_scaled_point_size())
 
         # Apply the font to the UI components (labels and instructions)
         self.filter_text.setFont(font)
@@ -59,15 +97,31 @@ class FontSelectionDialog(QDialog):
         # Create layout for the dialog
         layout = QFormLayout(self)
         layout.addRow("Filter by font name (leave blank for all):", self.filter_text)
-        layout.addRow(f"Number of fonts to compare (2-{total_fonts}):", self.font_count)
+        self.font_count_label = QLabel("Number of fonts to compare (loading fonts...):", self)
+        layout.addRow(self.font_count_label, self.font_count)
+
+        # Busy indicator shown until the font list has been loaded
+        self.loading_bar = QProgressBar(self)
+        self.loading_bar.setRange(0, 0)
+        layout.addRow(self.loading_bar)
 
         # Buttons
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
         buttons.accepted.connect(self.accept)
         buttons.rejected.connect(self.reject)
+        self.ok_button = buttons.button(QDialogButtonBox.Ok)
+        self.ok_button.setEnabled(False)
         layout.addRow(buttons)
         self.setLayout(layout)
 
+    def set_fonts(self, fonts):
+        """Enable the font count input once the available fonts are known."""
+        total_fonts = len(fonts)
+        self.font_count_validator.setTop(total_fonts)
+        self.font_count_label.setText(f"Number of fonts to compare (2-{total_fonts}):")
+        self.loading_bar.hide()
+        self.ok_button.setEnabled(True)
+
     def get_values(self):
         """Return user inputs: filter text and font count."""
         return self.filter_text.text().strip(), self.font_count.text().strip()
@@ -79,14 +133,20 @@ class FontTesterApp(QMainWindow):
 
         # Initialize settings and data
         self.default_font_size = 16
-        self.current_round_fonts = fonts
+
+        # Font names and their preview QFonts, built once; rounds hold indices into these
+        self._names = fonts
+        self._qfonts = [QFont(name, self.default_font_size) for name in fonts]
+
+        self.current_round_fonts = list(range(len(fonts)))
         self.round_winners = []
         self.current_pair_index = 0
         self.round_number = 1
         self.total_rounds = self.calculate_total_rounds(len(fonts))
         self.comparison_history = []
-        self.winner_counts = Counter()
+        self.winner_counts = Counter(dict.fromkeys(fonts, 0))  # Pre-sized with every font
         self.selection_enabled = True  # Control for enabling/disabling interactions
+        self._last_progress = -1  # Last value sent to the progress bar
 
         # Initialize UI
         self.init_ui()
@@ -110,20 +170,32 @@ class FontTesterApp(QMainWindow):
         self.left_panel = QVBoxLayout()
         self.left_font_label = QLabel("")
         self.left_font_label.setAlignment(Qt.AlignCenter)
-        self.left_text = QTextEdit()
-        self.left_text.setReadOnly(True)
+        self.left_text = QLabel()
+        self.left_text.setTextFormat(Qt.RichText)
+        self.left_text.setWordWrap(True)
+        self.left_text.setAlignment(Qt.AlignTop)
+        self.left_text.setText(_SAMPLE_HTML)
         self.left_panel.addWidget(self.left_font_label)
-        self.left_panel.addWidget(self.left_text)
+        self.left_scroll = QScrollArea()
+        self.left_scroll.setWidgetResizable(True)
+        self.left_scroll.setWidget(self.left_text)
+        self.left_panel.addWidget(self.left_scroll, 1)  # Preview takes the spare height
         self.font_layout.addLayout(self.left_panel)
 
         # Right font display
         self.right_panel = QVBoxLayout()
         self.right_font_label = QLabel("")
         self.right_font_label.setAlignment(Qt.AlignCenter)
-        self.right_text = QTextEdit()
-        self.right_text.setReadOnly(True)
+        self.right_text = QLabel()
+        self.right_text.setTextFormat(Qt.RichText)
+        self.right_text.setWordWrap(True)
+        self.right_text.setAlignment(Qt.AlignTop)
+        self.right_text.setText(_SAMPLE_HTML)
         self.right_panel.addWidget(self.right_font_label)
-        self.right_panel.addWidget(self.right_text)
+        self.right_scroll = QScrollArea()
+        self.right_scroll.setWidgetResizable(True)
+        self.right_scroll.setWidget(self.right_text)
+        self.right_panel.addWidget(self.right_scroll, 1)  # Preview takes the spare height
         self.font_layout.addLayout(self.right_panel)
 
         # Buttons
@@ -141,105 +213,107 @@ class FontTesterApp(QMainWindow):
         self.progress_bar.setMaximum(100)
         self.main_layout.addWidget(self.progress_bar)
 
+        # Coalesce progress updates so the bar repaints at most every 50 ms
+        self._pending_progress = None
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setSingleShot(True)
+        self._progress_timer.setInterval(50)
+        self._progress_timer.timeout.connect(self._flush_progress)
+
         # Status label
         self.status_label = QLabel("")
         self.status_label.setAlignment(Qt.AlignCenter)
         
-        # Increase the font size of the status label
-        screen = QApplication.primaryScreen()
-        dpi = screen.logicalDotsPerInch()
-
-        # Set the font size to scale with DPI for labels
-        scaled_font_size = int(10 + dpi // 96)  # Scale font size based on DPI (default DPI is 96)
-
-
+        # Increase the font size of the status label, scaled with DPI
         status_font = self.status_label.font()
-        status_font.setPointSize(scaled_font_size)  # Set the desired font size
+        status_font.setPointSize(_scaled_point_size())
         self.status_label.setFont(status_font)
         
         self.main_layout.addWidget(self.status_label)
 
-        # Enable key press events for the entire window
-        self.central_widget.setFocusPolicy(Qt.StrongFocus)
-        self.central_widget.installEventFilter(self)
+        # Bind the left and right arrow keys for the entire window
+        QShortcut(QKeySequence(Qt.Key_Left), self, activated=self.select_left)
+        QShortcut(QKeySequence(Qt.Key_Right), self, activated=self.select_right)
 
         # Start comparison
         self.update_fonts()
 
     def calculate_total_rounds(self, num_fonts):
         """Calculate the number of rounds required for elimination."""
-        rounds = 0
-        while num_fonts > 1:
-            num_fonts = (num_fonts + 1) // 2
-            rounds += 1
-        return rounds
+        # ceil(log2(num_fonts)): each round halves the field, rounding up
+        return max(0, num_fonts - 1).bit_length()
 
     def update_fonts(self):
         """Display the current pair of fonts for comparison."""
-        pairs = list(zip(self.current_round_fonts[::2], self.current_round_fonts[1::2]))
+        num_pairs = len(self.current_round_fonts) // 2
 
-        if self.current_pair_index < len(pairs):
-            left_font, right_font = pairs[self.current_pair_index]
+        if self.current_pair_index < num_pairs:
+            left_font = self.current_round_fonts[2 * self.current_pair_index]
+            right_font = self.current_round_fonts[2 * self.current_pair_index + 1]
             self.populate_text(self.left_text, self.left_font_label, left_font)
             self.populate_text(self.right_text, self.right_font_label, right_font)
 
             # Update status
             self.status_label.setText(
-                f"Round {self.round_number} of {self.total_rounds} — Pair {self.current_pair_index + 1} of {len(pairs)}"
+                f"Round {self.round_number} of {self.total_rounds} — Pair {self.current_pair_index + 1} of {num_pairs}"
             )
             progress = int(
                 (self.current_pair_index + len(self.round_winners))
                 / len(self.current_round_fonts)
                 * 100
             )
-            self.progress_bar.setValue(progress)
+            if progress != self._last_progress:
+                self._set_progress(progress)
+                self._last_progress = progress
         else:
             self.start_next_round()
 
-    def populate_text(self, text_widget, label, font_name):
-        """Fill the text widget with sample text in the given font."""
-        label.setText(font_name)
-        text_widget.setFont(QFont(font_name, self.default_font_size))
-        html_sample_text = """
-        <h1>Heading: The quick brown fox jumps over the lazy dog</h1>
-        <p><b>Bold:</b> <b>This is bold text</b></p>
-        <p><i>Italic:</i> <i>This is italicized text</i></p>
-        <p><b><i>Bold & Italic:</i></b> <b><i>This is bold and italicized text</i></b></p>
-        <ul>
-            <li>First bullet point</li>
-            <li>Second bullet point</li>
-        </ul>
-        <blockquote>A font comparison tool for better typography.</blockquote>
-        """
-        text_widget.setHtml(html_sample_text)
+    def _set_progress(self, progress):
+        """Update the progress bar now, or queue the value if it was updated in the last 50 ms."""
+        if self._progress_timer.isActive():
+            self._pending_progress = progress
+        else:
+            self.progress_bar.setValue(progress)
+            self._progress_timer.start()
+
+    def _flush_progress(self):
+        """Apply the most recent value queued while the throttle timer was running."""
+        if self._pending_progress is not None:
+            self.progress_bar.setValue(self._pending_progress)
+            self._pending_progress = None
+            self._progress_timer.start()
+
+    def populate_text(self, text_widget, label, font_index):
+        """Show the sample text in the font at the given index."""
+        label.setText(self._names[font_index])
+        # The sample text is set once in init_ui; only the font changes per pair
+        text_widget.setFont(self._qfonts[font_index])
 
     def select_left(self):
         """Mark the left font as the winner and proceed."""
         if self.selection_enabled:
-            pairs = list(zip(self.current_round_fonts[::2], self.current_round_fonts[1::2]))
-            left_font, _ = pairs[self.current_pair_index]
+            left_font = self.current_round_fonts[2 * self.current_pair_index]
             self.round_winners.append(left_font)
-            self.winner_counts[left_font] += 1
+            self.winner_counts[self._names[left_font]] += 1
             self.current_pair_index += 1
             self.update_fonts()
 
     def select_right(self):
         """Mark the right font as the winner and proceed."""
         if self.selection_enabled:
-            pairs = list(zip(self.current_round_fonts[::2], self.current_round_fonts[1::2]))
-            _, right_font = pairs[self.current_pair_index]
+            right_font = self.current_round_fonts[2 * self.current_pair_index + 1]
             self.round_winners.append(right_font)
-            self.winner_counts[right_font] += 1
+            self.winner_counts[self._names[right_font]] += 1
             self.current_pair_index += 1
             self.update_fonts()
 
     def start_next_round(self):
         """Start the next round or display the final results."""
-        if len(self.round_winners) > 1:
-            # Handle odd number of fonts: carry over one font to the next round
-            if len(self.round_winners) % 2 == 1:
-                self.round_winners.append(self.round_winners[-1])
+        # Handle odd number of fonts: the unpaired font advances on a bye and leads the next round
+        if len(self.current_round_fonts) % 2 == 1:
+            self.round_winners.insert(0, self.current_round_fonts[-1])
 
+        if len(self.round_winners) > 1:
             self.current_round_fonts = self.round_winners
             self.round_winners = []
             self.current_pair_index = 0
@@ -254,71 +328,81 @@ class FontTesterApp(QMainWindow):
         self.left_button.setEnabled(False)
         self.right_button.setEnabled(False)
 
-        winner = self.round_winners[0]
-        
-        # Sort the fonts by how many times they were selected
-        result_lines = [
-            f"{font} ({count})"
-            for font, count in sorted(self.winner_counts.items(), key=lambda x: x[1], reverse=True)
-        ]
-        
+        winner = self._names[self.round_winners[0]]
 
-        # Show at most 6 results
-        if len(result_lines) > 6:
-            result_text = "Final Winner:\t" + "\n\t* ".join(result_lines[:6]) 
-        else:
-            result_text = "Final Winner:\t" + "\n\t* ".join(result_lines)
+        # Show the champion first, then at most 5 other fonts ordered by how many times they were selected
+        result_lines = [f"{winner} ({self.winner_counts[winner]})"]
+        result_lines += [
+            f"{font} ({count})"
+            for font, count in self.winner_counts.most_common(6)
+            if count and font != winner
+        ][:5]
+        result_text = "Final Winner:\t" + "\n\t* ".join(result_lines)
 
         self.status_label.setText(result_text)
 
-    def eventFilter(self, source, event):
-        """Handle key events for left and right arrow keys."""
-        if event.type() == QEvent.KeyPress and self.selection_enabled:
-            if event.key() == Qt.Key_Left:
-                self.select_left()
-                return True
-            elif event.key() == Qt.Key_Right:
-                self.select_right()
-                return True
-        return super().eventFilter(source, event)
+
+def _launch_with(english_fonts, subset_size):
+    """Select a random subset of fonts and show the tester window."""
+    if subset_size is None:
+        subset_size = len(english_fonts)
+
+    # Select random subset of fonts; when testing all of them just shuffle a copy
+    if subset_size >= len(english_fonts):
+        selected_fonts = english_fonts[:]
+        random.shuffle(selected_fonts)
+    else:
+        selected_fonts = random.sample(english_fonts, subset_size)
+
+    # Launch the application
+    window = FontTesterApp(selected_fonts)
+    window.show()
+    return window
 
 
 def main():
     app = QApplication(sys.argv)
 
-    # Load system fonts and filter English-compatible ones
-    all_fonts = QFontDatabase().families()
-    english_fonts = filter_english_fonts(all_fonts)
-
     filter_string = None
-    subset_size = len(english_fonts)
-    subset_init = None
+    subset_size = None
+    windows = []  # Keeps the tester window alive once it has been launched
 
     # Process command-line arguments
     for arg in sys.argv[1:]:
         if arg.isdigit():
             subset_size = int(arg)
-            subset_init = 1
         else:
             filter_string = arg
 
-    # Filter fonts based on filter_string
-    if filter_string:
-        english_fonts = filter_fonts_by_string(english_fonts, filter_string)
-
-    # Interactive dialog if subset_size is not specified
-    if not subset_init and not filter_string:
-        dialog = FontSelectionDialog(len(english_fonts))
-        if dialog.exec() == QDialog.Accepted:
-            filter_string, subset_size_str = dialog.get_values()
-            subset_size = int(subset_size_str) if subset_size_str else len(english_fonts)
-
-    # Select random subset of fonts
-    selected_fonts = random.sample(english_fonts, min(subset_size, len(english_fonts)))
+    # Load system fonts and filter English-compatible ones
+    if subset_size is None and not filter_string:
+        # Interactive dialog; enumerate the fonts in the background while it is shown
+        loader = FontLoaderThread()
+        dialog = FontSelectionDialog()
+        loader.families_ready.connect(dialog.set_fonts)
+
+        def on_dialog_finished(result):
+            subset_size_str = ""
+            if result == QDialog.Accepted:
+                _, subset_size_str = dialog.get_values()
+            loader.wait()
+            windows.append(_launch_with(loader.fonts, int(subset_size_str) if subset_size_str.isdigit() else None))
+            app.setQuitOnLastWindowClosed(True)
+
+        # Closing the dialog must not quit the application before the tester window is shown
+        app.setQuitOnLastWindowClosed(False)
+        dialog.finished.connect(on_dialog_finished)
+        loader.start()
+        dialog.open()
+    else:
+        english_fonts = filter_english_fonts(_font_families())
+
+        # Filter fonts based on filter_string
+        if filter_string:
+            english_fonts = filter_fonts_by_string(english_fonts, filter_string)
+
+        windows.append(_launch_with(english_fonts, subset_size))
 
-    # Launch the application
-    window = FontTesterApp(selected_fonts)
-    window.show()
     sys.exit(app.exec_())
 
 